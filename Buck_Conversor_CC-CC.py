@@ -1,10 +1,14 @@
+import os
 import tkinter as tk
-from tkinter import ttk
+from tkinter import ttk, messagebox
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
 import matplotlib
+from simulacao_buck import simular_buck, metricas_buck
+from historico import HistoricoSimulacoes, desenhar_comparacao
+from esquematico import Esquematico
 
 # Configurar matplotlib para usar o backend TkAgg
 matplotlib.use('TkAgg')
@@ -22,6 +26,12 @@ class BuckConverterApp:
         # Variáveis do circuito
         self.setup_variables()
         
+        # Histórico de simulações em disco
+        self.historico = HistoricoSimulacoes(
+            os.path.join(os.path.expanduser('~'), '.simulador_potencia', 'buck'))
+        self.current_id = None
+        self.current_data = None
+        
         # Criar interface
         self.create_widgets()
         
@@ -58,14 +68,21 @@ class BuckConverterApp:
         self.L = tk.DoubleVar(value=220e-6)
         self.C = tk.DoubleVar(value=47e-6)
         self.R_esr = tk.DoubleVar(value=0.01)
+        self.Vd = tk.DoubleVar(value=0.5)
         
         # Resultados
         self.results = {
             'Vavg': tk.StringVar(value='---'),
             'Vripple': tk.StringVar(value='---'),
+            'Vripple_rms': tk.StringVar(value='---'),
             'Iripple': tk.StringVar(value='---'),
-            'Duty': tk.StringVar(value='---')
+            'Duty': tk.StringVar(value='---'),
+            'Modo': tk.StringVar(value='---')
         }
+        
+        # Comparação com execuções anteriores
+        self.compare_run = tk.StringVar(value='')
+        self.compare_mode = tk.StringVar(value='Nenhum')
 
     def create_widgets(self):
         # Frame principal
@@ -84,6 +101,8 @@ class BuckConverterApp:
         # Criar seções
         self.create_parameter_section(left_panel)
         self.create_results_section(left_panel)
+        self.create_history_section(left_panel)
+        self.create_schematic_section(right_panel)
         self.create_graph_section(right_panel)
         
     def create_parameter_section(self, parent):
@@ -98,7 +117,8 @@ class BuckConverterApp:
             ("Frequência (Hz)", self.fsw),
             ("Indutância (µH)", self.L),
             ("Capacitância (µF)", self.C),
-            ("ESR Capacitor (Ω)", self.R_esr)
+            ("ESR Capacitor (Ω)", self.R_esr),
+            ("Queda do Diodo (V)", self.Vd)
         ]
         
         for text, var in params:
@@ -124,8 +144,10 @@ class BuckConverterApp:
         results = [
             ("Tensão Média (V)", 'Vavg'),
             ("Ripple de Tensão (V)", 'Vripple'),
+            ("Ripple RMS (V)", 'Vripple_rms'),
             ("Ripple de Corrente (A)", 'Iripple'),
-            ("Duty Cycle (%)", 'Duty')
+            ("Duty Cycle (%)", 'Duty'),
+            ("Modo de Condução", 'Modo')
         ]
         
         for text, key in results:
@@ -136,6 +158,104 @@ class BuckConverterApp:
             ttk.Label(row, textvariable=self.results[key], width=10, 
                      foreground='blue', anchor=tk.E).pack(side=tk.RIGHT)
     
+    def create_history_section(self, parent):
+        frame = ttk.LabelFrame(parent, text="HISTÓRICO", padding=(15, 10))
+        frame.pack(fill=tk.X, pady=(15, 0))
+        
+        self.history_combo = ttk.Combobox(frame, textvariable=self.compare_run,
+                                          state='readonly')
+        self.history_combo.pack(fill=tk.X, pady=5)
+        self.history_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_plots())
+        
+        row = ttk.Frame(frame)
+        row.pack(fill=tk.X, pady=5)
+        ttk.Label(row, text="Comparação", width=20, anchor=tk.W).pack(side=tk.LEFT)
+        mode_combo = ttk.Combobox(row, textvariable=self.compare_mode, width=10,
+                                  values=('Nenhum', 'Sobrepor', 'Diferença'),
+                                  state='readonly')
+        mode_combo.pack(side=tk.RIGHT)
+        mode_combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_plots())
+        
+        ttk.Button(frame, text="LIMPAR HISTÓRICO", command=self.clear_history).pack(fill=tk.X, pady=(5, 0))
+    
+    def update_history_list(self):
+        values = [label for _, label in self.historico.opcoes(excluir=self.current_id)]
+        self.history_combo['values'] = values
+        if self.compare_run.get() not in values:
+            self.compare_run.set(values[0] if values else '')
+    
+    def selected_run_id(self):
+        if self.compare_mode.get() == 'Nenhum':
+            return None
+        return self.historico.id_da_descricao(self.compare_run.get())
+    
+    def clear_history(self):
+        self.historico.limpar()
+        self.current_id = None
+        self.update_history_list()
+        self.refresh_plots()
+    
+    def refresh_plots(self):
+        if self.current_data is not None:
+            self.update_plots(*self.current_data)
+    
+    def create_schematic_section(self, parent):
+        frame = ttk.LabelFrame(parent, text="ESQUEMA DO CIRCUITO", padding=(5, 5))
+        frame.pack(fill=tk.X, pady=(0, 10))
+        
+        canvas = tk.Canvas(frame, width=600, height=180, bg='white', highlightthickness=0)
+        canvas.pack(fill=tk.X, expand=True)
+        
+        # Montado uma vez; run_simulation só atualiza os rótulos
+        e = self.schematic = Esquematico(canvas, 600, 180)
+        
+        # Fonte CC
+        e.fonte_tensao(60, 100, chave='Vin')
+        e.linha(60, 75, 60, 40)
+        e.linha(60, 125, 60, 150)
+        
+        # Chave (MOSFET)
+        e.linha(60, 40, 120, 40)
+        e.interruptor(120, 40, chave='S')
+        e.linha(160, 40, 260, 40)
+        
+        # Diodo de roda livre
+        e.oval(198, 37, 202, 43, fill='black')
+        e.linha(200, 40, 200, 80)
+        e.diodo(200, 100, 'up', cor='green')
+        e.texto(225, 95, '', chave='D', anchor='w')
+        e.linha(200, 100, 200, 150)
+        
+        # Indutor
+        e.indutor(280, 40, chave='L')
+        e.linha(300, 40, 480, 40)
+        
+        # Capacitor (com ESR)
+        e.oval(378, 37, 382, 43, fill='black')
+        e.linha(380, 40, 380, 70)
+        e.capacitor(380, 95, chave='C')
+        e.linha(380, 120, 380, 150)
+        
+        # Carga
+        e.linha(480, 40, 480, 85)
+        e.resistor(480, 95, chave='R')
+        e.linha(480, 105, 480, 150)
+        e.texto(530, 40, '', fonte=('Arial', 9, 'bold'), chave='Vout', fill='blue')
+        
+        # Retorno
+        e.linha(60, 150, 480, 150)
+    
+    def update_schematic(self, Vin, D, fsw, L, C, R_esr, Vd, R_load, Vavg):
+        self.schematic.atualizar_textos({
+            'Vin': f"CC\n{Vin:g}V",
+            'S': f"{fsw / 1000:g}kHz\nD={D * 100:.1f}%",
+            'D': f"{Vd:g}V",
+            'L': f"{L * 1e6:g}µH",
+            'C': f"{C * 1e6:g}µF\n{R_esr:g}Ω",
+            'R': f"{R_load:.3g}Ω",
+            'Vout': f"{Vavg:.2f}V",
+        })
+    
     def create_graph_section(self, parent):
         # Frame para os gráficos
         graph_frame = ttk.Frame(parent)
@@ -175,6 +295,7 @@ class BuckConverterApp:
             L = self.L.get()
             C = self.C.get()
             R_esr = self.R_esr.get()
+            Vd = self.Vd.get()
             R_load = Vout / Iout
             
             # Verificar valores
@@ -183,57 +304,42 @@ class BuckConverterApp:
             
             # Calcular duty cycle
             D = Vout / Vin
+            Vout_ref = Vout
             
-            # Tempo de simulação
-            t_sim = 5e-3  # 5 ms
-            dt = 1 / (fsw * 200)
-            t = np.arange(0, t_sim, dt)
-            
-            # Inicializar variáveis
-            Vout = np.zeros_like(t)
-            V_L = np.zeros_like(t)
-            V_C = np.zeros_like(t)
-            I_L = np.zeros_like(t)
-            I_C = np.zeros_like(t)
-            
-            # Condições iniciais
-            V_C[0] = 0.0
-            I_L[0] = 0.0
-            
-            # Simulação
-            for i in range(1, len(t)):
-                # Controle PWM
-                if (t[i] * fsw) % 1.0 < D:
-                    V_L[i] = Vin - V_C[i-1]  # MOSFET ligado
-                else:
-                    V_L[i] = -V_C[i-1]       # MOSFET desligado
-                
-                # Atualizar corrente no indutor
-                I_L[i] = I_L[i-1] + (V_L[i] / L) * dt
-                
-                # Atualizar corrente no capacitor
-                I_C[i] = I_L[i] - (V_C[i-1] / R_load)
-                
-                # Atualizar tensão no capacitor
-                V_C[i] = V_C[i-1] + (I_C[i] / C) * dt
-                
-                # Tensão na carga (com ESR)
-                Vout[i] = V_C[i] + (I_C[i] * R_esr)
+            # Simulação orientada a eventos (diodo de roda livre + DCM)
+            t, Vout, V_L, V_C, I_L = simular_buck(
+                Vin, D, fsw, L, C, R_load, R_esr, Vd, t_sim=5e-3)
             
             # Calcular resultados
-            start_idx = int(0.9 * len(t))  # Ignorar transitório
-            Vavg = np.mean(Vout[start_idx:])
-            Vripple = np.max(Vout[start_idx:]) - np.min(Vout[start_idx:])
-            Iripple = np.max(I_L) - np.min(I_L)
+            metricas = metricas_buck(t, Vout, I_L, fsw)
+            Vavg = metricas['Vavg']
+            Vripple = metricas['Vripple']
+            Vripple_rms = metricas['Vripple_rms']
+            Iripple = metricas['Iripple']
+            modo = 'DCM' if metricas['dcm'] else 'CCM'
             
             # Atualizar interface
             self.results['Vavg'].set(f"{Vavg:.3f}")
             self.results['Vripple'].set(f"{Vripple:.3f}")
+            self.results['Vripple_rms'].set(f"{Vripple_rms:.4f}")
             self.results['Iripple'].set(f"{Iripple:.3f}")
             self.results['Duty'].set(f"{D*100:.1f}")
+            self.results['Modo'].set(modo)
+            
+            self.update_schematic(Vin, D, fsw, L, C, R_esr, Vd, R_load, Vavg)
+            
+            # Guardar no histórico
+            self.current_id = self.historico.salvar(
+                {'Vin': Vin, 'Vout': Vout_ref, 'Iout': Iout, 'fsw': fsw,
+                 'L': L, 'C': C, 'R_esr': R_esr, 'Vd': Vd},
+                {'Vavg': Vavg, 'Vripple': Vripple, 'Vripple_rms': Vripple_rms,
+                 'Iripple': Iripple, 'thd': metricas['thd']},
+                {'t': t, 'Vout': Vout, 'V_L': V_L, 'V_C': V_C, 'I_L': I_L})
+            self.update_history_list()
             
             # Atualizar gráficos
-            self.update_plots(t, Vout, V_L, V_C, Vavg)
+            self.current_data = (t, Vout, V_L, V_C, Vavg)
+            self.update_plots(*self.current_data)
             
         except Exception as e:
             messagebox.showerror("Erro", f"Falha na simulação:\n{str(e)}")
@@ -246,22 +352,32 @@ class BuckConverterApp:
         for ax in [self.ax1, self.ax2, self.ax3]:
             ax.clear()
         
+        run_id = self.selected_run_id()
+        mode = self.compare_mode.get()
+        diff = run_id is not None and mode == 'Diferença'
+        
         # Gráfico 1: Tensão na Carga
-        self.ax1.plot(t_ms, Vout, 'b', label='Tensão na Carga')
-        self.ax1.axhline(y=Vavg, color='r', linestyle='--', label=f'Média: {Vavg:.2f}V')
+        if not diff:
+            self.ax1.plot(t_ms, Vout, 'b', label='Tensão na Carga')
+            self.ax1.axhline(y=Vavg, color='r', linestyle='--', label=f'Média: {Vavg:.2f}V')
+        desenhar_comparacao(self.ax1, self.historico, run_id, 'Vout', t, Vout, mode, 1000)
         self.ax1.set_title('Tensão na Carga')
         self.ax1.set_ylabel('Tensão (V)')
         self.ax1.legend()
         self.ax1.grid(True)
         
         # Gráfico 2: Tensão no Indutor
-        self.ax2.plot(t_ms, V_L, 'g')
+        if not diff:
+            self.ax2.plot(t_ms, V_L, 'g')
+        desenhar_comparacao(self.ax2, self.historico, run_id, 'V_L', t, V_L, mode, 1000)
         self.ax2.set_title('Tensão no Indutor')
         self.ax2.set_ylabel('Tensão (V)')
         self.ax2.grid(True)
         
         # Gráfico 3: Tensão no Capacitor
-        self.ax3.plot(t_ms, V_C, 'm')
+        if not diff:
+            self.ax3.plot(t_ms, V_C, 'm')
+        desenhar_comparacao(self.ax3, self.historico, run_id, 'V_C', t, V_C, mode, 1000)
         self.ax3.set_title('Tensão no Capacitor')
         self.ax3.set_xlabel('Tempo (ms)')
         self.ax3.set_ylabel('Tensão (V)')
@@ -1,13 +1,17 @@
 import math
+import os
 import tkinter as tk
-from tkinter import messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog
 import csv
 import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.widgets import Cursor
-from scipy.integrate import odeint
 from scipy import signal
+from simulacao_retificador import (simular_retificador, metricas_retificador,
+                                   simular_retificador_lote)
+from historico import HistoricoSimulacoes, desenhar_comparacao
+from esquematico import Esquematico
 
 
 class CircuitoRetificadorApp:
@@ -36,6 +40,15 @@ class CircuitoRetificadorApp:
         self.current_V_rect = None
         self.current_V_R = None
         self.f_cut = None  # Armazenar frequência de corte
+        self.current_RLC = None
+        self.esquema = None
+
+        # Histórico de simulações em disco
+        self.historico = HistoricoSimulacoes(
+            os.path.join(os.path.expanduser('~'), '.simulador_potencia', 'retificador'))
+        self.id_atual = None
+        self.comparar_execucao = tk.StringVar(value='')
+        self.comparar_modo = tk.StringVar(value='Nenhum')
 
         # Criar interface
         self.criar_widgets()
@@ -75,6 +88,8 @@ class CircuitoRetificadorApp:
                  font=self.fonte, bg="#4CAF50", fg="white", padx=10).pack(side=tk.LEFT, padx=5)
         tk.Button(frame_botoes, text="Exportar Dados", command=self.exportar_dados,
                  font=self.fonte, bg="#2196F3", fg="white", padx=10).pack(side=tk.LEFT, padx=5)
+        tk.Button(frame_botoes, text="Curvas de Projeto", command=self.curvas_projeto,
+                 font=self.fonte, bg="#FF9800", fg="white", padx=10).pack(side=tk.LEFT, padx=5)
         
         # Frame de resultados
         self.frame_resultados = tk.LabelFrame(frame_controles, text="Resultados da Simulação", 
@@ -88,7 +103,9 @@ class CircuitoRetificadorApp:
             ("Tensão Média na Carga (V_R)", "V"),
             ("Corrente Média na Carga (Iavg)", "A"),
             ("Ondulação de Tensão (ΔV)", "V"),
+            ("Ripple RMS", "V"),
             ("Fator de Ripple", ""),
+            ("THD do Ripple", "%"),
             ("Frequência de Corte", "Hz")
         ]
         
@@ -104,6 +121,29 @@ class CircuitoRetificadorApp:
             tk.Label(frame, text=unidade, font=self.fonte, 
                    bg='#f0f0f0').pack(side=tk.LEFT, padx=5)
         
+        # Frame de histórico
+        frame_historico = tk.LabelFrame(frame_controles, text="Histórico",
+                                      font=self.fonte_titulo, bg='#f0f0f0', padx=5, pady=5)
+        frame_historico.pack(fill=tk.X, pady=(10, 0))
+
+        self.combo_historico = ttk.Combobox(frame_historico, textvariable=self.comparar_execucao,
+                                            state='readonly', font=self.fonte)
+        self.combo_historico.pack(fill=tk.X, pady=2)
+        self.combo_historico.bind('<<ComboboxSelected>>', lambda e: self.redesenhar_graficos())
+
+        frame_modo = tk.Frame(frame_historico, bg='#f0f0f0')
+        frame_modo.pack(fill=tk.X, pady=2)
+        tk.Label(frame_modo, text="Comparação", width=20, anchor="w",
+               font=self.fonte, bg='#f0f0f0').pack(side=tk.LEFT)
+        combo_modo = ttk.Combobox(frame_modo, textvariable=self.comparar_modo, width=10,
+                                  values=('Nenhum', 'Sobrepor', 'Diferença'),
+                                  state='readonly', font=self.fonte)
+        combo_modo.pack(side=tk.RIGHT)
+        combo_modo.bind('<<ComboboxSelected>>', lambda e: self.redesenhar_graficos())
+
+        tk.Button(frame_historico, text="Limpar Histórico", command=self.limpar_historico,
+                 font=self.fonte, bg="#9E9E9E", fg="white", padx=10).pack(anchor="w", pady=(5, 0))
+
         # Frame de gráficos (direita)
         frame_graficos = tk.Frame(main_frame, bg='#f0f0f0')
         frame_graficos.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -157,91 +197,84 @@ class CircuitoRetificadorApp:
                 widget.config(bg='#ffdddd')
 
     def desenhar_circuito(self):
-        c = self.canvas_circuito
-        c.delete("all")
-        
+        # O esquema é montado uma vez; depois só os rótulos de valores mudam
+        if self.esquema is None:
+            self.esquema = Esquematico(self.canvas_circuito, 500, 300)
+            self.montar_circuito()
+
+        self.esquema.atualizar_textos({
+            'fonte': f"AC\n{self.Vrms.get()}V\n{self.freq.get()}Hz",
+            'L': f"{self.L.get()}H",
+            'R': f"{self.R.get()}Ω",
+            'C': f"{self.C.get() * 1e9:.0f}pF",
+        })
+
+    def montar_circuito(self):
+        e = self.esquema
+
         # Fonte AC
-        c.create_oval(50, 100, 100, 150, outline='blue', width=2)
-        c.create_text(75, 125, text=f"AC\n{self.Vrms.get()}V\n{self.freq.get()}Hz",
-                     font=('Arial', 9), fill='blue')
-        
+        e.fonte_tensao(75, 125, chave='fonte')
+
         # Diodo Schottky (1N5819)
-        c.create_line(100, 125, 130, 125, width=2)
-        self.desenhar_diodo(130, 125, 'right', '', 'red')
-        c.create_text(138, 105, text='1N5859', font=('Arial', 8), fill='black')
-        
+        e.linha(100, 125, 130, 125)
+        e.diodo(130, 125, 'right', '', 'red')
+        e.texto(138, 105, '1N5859', fill='black')
+
         # Nó de conexão
-        c.create_oval(155, 122, 158, 128, fill='black')
-        
+        e.oval(155, 122, 158, 128, fill='black')
+
         # Ramo 1: Indutor + Resistor
-        c.create_line(150, 125, 200, 125, width=2)
-        self.desenhar_indutor(200, 125)
-        c.create_line(180, 125, 250, 125, width=2)
-        self.desenhar_resistor(300, 175, f"{self.R.get()}Ω")
-        c.create_line(250, 125, 250, 160, width=2)
-        
+        e.linha(150, 125, 200, 125)
+        e.indutor(200, 125, chave='L')
+        e.linha(180, 125, 250, 125)
+        e.resistor(300, 175, chave='R')
+        e.linha(250, 125, 250, 160)
+
         # Capacitor em Paralelo com Resistor
-        c.create_line(250, 125, 300, 125, width=2)
-        c.create_line(300, 125, 300, 175, width=2)
-        self.desenhar_capacitor(250, 175, f"{self.C.get() * 1e9:.0f}pF")
-        c.create_line(250, 210, 300, 210, width=2)
-        c.create_line(300, 175, 300, 210, width=2)
-        c.create_line(250, 190, 250, 210, width=2)
-        
+        e.linha(250, 125, 300, 125)
+        e.linha(300, 125, 300, 175)
+        e.capacitor(250, 175, chave='C')
+        e.linha(250, 210, 300, 210)
+        e.linha(300, 175, 300, 210)
+        e.linha(250, 190, 250, 210)
+
         # Ramo 2: Diodo de roda livre (1N4007)
-        c.create_line(158, 125, 158, 175, width=2)
-        self.desenhar_diodo(158, 175, 'up', '', 'green')
-        c.create_text(180, 150, text="1N4007", font=('Arial', 8), fill='black')
-        c.create_line(158, 175, 158, 210, width=2)
-        
+        e.linha(158, 125, 158, 175)
+        e.diodo(158, 175, 'up', '', 'green')
+        e.texto(180, 150, "1N4007", fill='black')
+        e.linha(158, 175, 158, 210)
+
         # Ramo 3: conexão do nó do resistor, diodo 1N4007 e fonte
-        c.create_line(250, 210, 70, 210, width=2)
-        c.create_line(70, 210, 70, 150, width=2)
-        
+        e.linha(250, 210, 70, 210)
+        e.linha(70, 210, 70, 150)
+
         # Legenda
-        c.create_text(250, 50, text="Circuito Retificador",
-                     font=('Arial', 12, 'bold'), fill='black')
-        c.create_text(250, 80, text="Diodo Schottky (1N5819) e Diodo de Roda Livre (1N4007)",
-                     font=('Arial', 10), fill='black')
-
-    def desenhar_diodo(self, x, y, direcao, modelo, cor):
-        if direcao == 'right':
-            points = [x, y - 10, x + 20, y, x, y + 10]  # →
-            c_text = (x + 25, y)
-        elif direcao == 'up':
-            points = [x - 10, y, x, y - 20, x + 10, y]  # ↑
-            c_text = (x, y - 25)
-        
-        self.canvas_circuito.create_polygon(points, fill=cor, outline='black')
-        self.canvas_circuito.create_text(*c_text, text=modelo, font=('Arial', 8))
-
-    def desenhar_indutor(self, x, y):
-        for i in range(5):
-            self.canvas_circuito.create_arc(
-                x - 20 + i * 8, y - 10, x - 12 + i * 8, y + 10,
-                start=0, extent=180, style='arc', width=2
-            )
-        self.canvas_circuito.create_text(x, y - 20, text=f"{self.L.get()}H", font=('Arial', 8))
-
-    def desenhar_resistor(self, x, y, valor):
-        self.canvas_circuito.create_rectangle(
-            x - 15, y - 10, x + 15, y + 10,
-            fill='brown', outline='black', width=2
-        )
-        self.canvas_circuito.create_text(x + 35, y, text=valor, font=('Arial', 8))
-
-    def desenhar_capacitor(self, x, y, valor):
-        # Desenho do capacitor na vertical
-        # Linhas horizontais (placas do capacitor)
-        self.canvas_circuito.create_line(x - 15, y - 15, x + 15, y - 15, width=2)  # Placa superior
-        self.canvas_circuito.create_line(x - 15, y + 15, x + 15, y + 15, width=2)  # Placa inferior
-        
-        # Conexões verticais
-        self.canvas_circuito.create_line(x, y - 25, x, y - 15, width=2)  # Conexão superior
-        self.canvas_circuito.create_line(x, y + 15, x, y + 25, width=2)  # Conexão inferior
-        
-        # Texto do valor (posicionado ao lado)
-        self.canvas_circuito.create_text(x - 60, y, text=valor, font=('Arial', 8), anchor='w')
+        e.texto(250, 50, "Circuito Retificador",
+                fonte=('Arial', 12, 'bold'), fill='black')
+        e.texto(250, 80, "Diodo Schottky (1N5819) e Diodo de Roda Livre (1N4007)",
+                fonte=('Arial', 10), fill='black')
+
+    def atualizar_lista_historico(self):
+        valores = [rotulo for _, rotulo in self.historico.opcoes(excluir=self.id_atual)]
+        self.combo_historico['values'] = valores
+        if self.comparar_execucao.get() not in valores:
+            self.comparar_execucao.set(valores[0] if valores else '')
+
+    def execucao_selecionada(self):
+        if self.comparar_modo.get() == 'Nenhum':
+            return None
+        return self.historico.id_da_descricao(self.comparar_execucao.get())
+
+    def limpar_historico(self):
+        self.historico.limpar()
+        self.id_atual = None
+        self.atualizar_lista_historico()
+        self.redesenhar_graficos()
+
+    def redesenhar_graficos(self):
+        if self.current_t is not None:
+            self.atualizar_graficos(self.current_t, self.current_V_ac, self.current_V_rect,
+                                    self.current_V_R, *self.current_RLC)
 
     def calcular_resposta_frequencia(self, R, L, C):
         # Criar função de transferência do filtro LC
@@ -277,46 +310,23 @@ class CircuitoRetificadorApp:
 
             # Cálculos básicos
             Vp = Vrms * math.sqrt(2)
-            T = 1 / f
-            omega = 2 * math.pi * f
 
             # Frequência de corte do filtro LC
             self.f_cut = 1 / (2 * math.pi * math.sqrt(L * C))
 
-            # Simulação numérica - Aumentado de 4 para 10 ciclos e de 4000 para 10000 pontos
-            t = np.linspace(0, 60 * T, 10000)  # 10 ciclos com 10000 pontos
-            y0 = [0, 0]  # [corrente no indutor, tensão no capacitor]
-
-            def circuito_deriv(y, t):
-                i_L, v_C = y
-                v_in = Vp * np.sin(omega * t)
-
-                if v_in > Vd_schottky:
-                    v_rect = v_in - Vd_schottky
-                else:
-                    v_rect = -Vd_common
-
-                di_Ldt = (v_rect - v_C) / L
-                dv_Cdt = (i_L - v_C / R) / C
-
-                return [di_Ldt, dv_Cdt]
-
-            sol = odeint(circuito_deriv, y0, t)
-            i_L = sol[:, 0]
-            v_C = sol[:, 1]
-
-            # Tensão retificada para plotagem
-            V_rect = np.array([Vp * np.sin(omega * ti) - Vd_schottky
-                               if Vp * np.sin(omega * ti) > Vd_schottky
-                               else -Vd_common for ti in t])
+            # Simulação numérica - 60 ciclos com 10000 pontos
+            t, V_ac, V_rect, i_L, v_C = simular_retificador(
+                Vrms, f, R, L, C, Vd_schottky, Vd_common)
 
             # Cálculo de parâmetros (ignorar os primeiros ciclos para regime permanente)
-            start_idx = int(2 * T / (t[1] - t[0]))
-            Vavg_rect = np.mean(V_rect[start_idx:])
-            Vavg_R = np.mean(v_C[start_idx:])
-            Iavg = np.mean(i_L[start_idx:])
-            ripple_V = np.max(v_C[start_idx:]) - np.min(v_C[start_idx:])
-            ripple_factor = ripple_V / Vavg_R if Vavg_R != 0 else 0
+            metricas = metricas_retificador(t, V_rect, i_L, v_C, f)
+            Vavg_rect = metricas['Vavg_rect']
+            Vavg_R = metricas['Vavg_R']
+            Iavg = metricas['Iavg']
+            ripple_V = metricas['ripple_V']
+            ripple_factor = metricas['ripple_factor']
+            ripple_rms = metricas['ripple_rms']
+            thd = metricas['thd']
 
             # Atualizar resultados
             resultados = {
@@ -325,7 +335,9 @@ class CircuitoRetificadorApp:
                 "Tensão Média na Carga (V_R)": f"{Vavg_R:.2f}",
                 "Corrente Média na Carga (Iavg)": f"{Iavg:.4f}",
                 "Ondulação de Tensão (ΔV)": f"{ripple_V:.4f}",
+                "Ripple RMS": f"{ripple_rms:.4f}",
                 "Fator de Ripple": f"{ripple_factor:.4f}",
+                "THD do Ripple": f"{thd * 100:.2f}",
                 "Frequência de Corte": f"{self.f_cut:.2f}"
             }
 
@@ -334,9 +346,18 @@ class CircuitoRetificadorApp:
 
             # Armazenar dados para interação
             self.current_t = t
-            self.current_V_ac = Vp * np.sin(omega * t)
+            self.current_V_ac = V_ac
             self.current_V_rect = V_rect
             self.current_V_R = v_C
+            self.current_RLC = (R, L, C)
+
+            # Guardar no histórico
+            self.id_atual = self.historico.salvar(
+                {'Vrms': Vrms, 'freq': f, 'R': R, 'L': L, 'C': C,
+                 'Vd_schottky': Vd_schottky, 'Vd_common': Vd_common},
+                {k: v for k, v in metricas.items() if k != 'harmonicos'},
+                {'t': t, 'V_ac': V_ac, 'V_rect': V_rect, 'V_R': v_C, 'i_L': i_L})
+            self.atualizar_lista_historico()
 
             # Atualizar gráficos
             self.atualizar_graficos(t, self.current_V_ac, V_rect, v_C, R, L, C)
@@ -360,6 +381,11 @@ class CircuitoRetificadorApp:
         
         # Configurar cores e estilos
         colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728']
+
+        # Execução anterior para sobrepor ou subtrair
+        id_comparacao = self.execucao_selecionada()
+        modo = self.comparar_modo.get()
+        diferenca_ativa = id_comparacao is not None and modo == 'Diferença'
         
         # Gráfico 1: Tensão AC
         line1, = ax1.plot(t, V_ac, color=colors[0], linewidth=1.5, picker=5)
@@ -367,6 +393,9 @@ class CircuitoRetificadorApp:
         ax1.set_ylabel('Tensão (V)', fontsize=9)
         ax1.grid(True, linestyle=':', alpha=0.7)
         ax1.tick_params(labelsize=8)
+        if desenhar_comparacao(ax1, self.historico, id_comparacao, 'V_ac', t, V_ac, modo):
+            line1.set_visible(not diferenca_ativa)
+            ax1.legend(fontsize=8, loc='upper right')
         
         # Gráfico 2: Tensão Retificada
         line2, = ax2.plot(t, V_rect, color=colors[1], linewidth=1.5, picker=5)
@@ -374,18 +403,25 @@ class CircuitoRetificadorApp:
         ax2.set_ylabel('Tensão (V)', fontsize=9)
         ax2.grid(True, linestyle=':', alpha=0.7)
         ax2.tick_params(labelsize=8)
+        if desenhar_comparacao(ax2, self.historico, id_comparacao, 'V_rect', t, V_rect, modo):
+            line2.set_visible(not diferenca_ativa)
+            ax2.legend(fontsize=8, loc='upper right')
         
         # Gráfico 3: Tensão na Carga
         line3, = ax3.plot(t, V_R, color=colors[2], linewidth=1.5, picker=5)
-        mean_V_R = np.mean(V_R[len(V_R) // 2:])
-        ax3.axhline(mean_V_R, color='k', linestyle='--', linewidth=1,
-                   label=f'Média = {mean_V_R:.2f}V')
+        if not diferenca_ativa:
+            mean_V_R = np.mean(V_R[len(V_R) // 2:])
+            ax3.axhline(mean_V_R, color='k', linestyle='--', linewidth=1,
+                       label=f'Média = {mean_V_R:.2f}V')
+            ax3.legend(fontsize=8, loc='upper right')
         ax3.set_title('3. Tensão na Carga', fontsize=10, pad=10)
         ax3.set_xlabel('Tempo (s)', fontsize=9)
         ax3.set_ylabel('Tensão (V)', fontsize=9)
-        ax3.legend(fontsize=8, loc='upper right')
         ax3.grid(True, linestyle=':', alpha=0.7)
         ax3.tick_params(labelsize=8)
+        if desenhar_comparacao(ax3, self.historico, id_comparacao, 'V_R', t, V_R, modo):
+            line3.set_visible(not diferenca_ativa)
+            ax3.legend(fontsize=8, loc='upper right')
         
         # Gráfico 4: Diagrama de Bode (Resposta em Frequência)
         f, mag, phase = self.calcular_resposta_frequencia(R, L, C)
@@ -480,6 +516,70 @@ class CircuitoRetificadorApp:
         self.fig.tight_layout()
         self.canvas_graficos.draw()
 
+    def curvas_projeto(self):
+        try:
+            Vrms = self.Vrms.get()
+            f = self.freq.get()
+            R = self.R.get()
+            L = self.L.get()
+            C = self.C.get()
+            Vd_schottky = self.Vd_schottky.get()
+            Vd_common = self.Vd_common.get()
+
+            if any(v <= 0 for v in [Vrms, f, R, L, C]):
+                messagebox.showerror("Erro", "Valores devem ser positivos!")
+                return
+
+            # Regulação de carga (varrendo R) e dimensionamento do filtro
+            # (varrendo C) empilhados em uma única simulação em lote
+            n = 40
+            R_var = R * np.logspace(-1, 1, n)
+            C_var = C * np.logspace(-1, 1, n)
+            res = simular_retificador_lote(
+                Vrms, f,
+                np.concatenate([R_var, np.full(n, R)]), L,
+                np.concatenate([np.full(n, C), C_var]),
+                Vd_schottky, Vd_common)
+
+            janela = tk.Toplevel(self.root)
+            janela.title("Curvas de Regulação e Dimensionamento do Filtro")
+            janela.geometry("900x450")
+
+            fig = plt.Figure(figsize=(9, 4.5), dpi=100, facecolor='#f0f0f0')
+            ax1 = fig.add_subplot(121)
+            ax2 = fig.add_subplot(122)
+
+            # Gráfico 1: Tensão média na carga x corrente média
+            ax1.plot(res['Iavg'][:n], res['Vavg_R'][:n], color='#1f77b4',
+                     linewidth=1.5, marker='o', markersize=3)
+            ax1.set_title('1. Regulação de Carga', fontsize=10, pad=10)
+            ax1.set_xlabel('Corrente Média na Carga (A)', fontsize=9)
+            ax1.set_ylabel('Tensão Média na Carga (V)', fontsize=9)
+            ax1.grid(True, linestyle=':', alpha=0.7)
+            ax1.tick_params(labelsize=8)
+
+            # Gráfico 2: Fator de ripple x capacitância
+            ax2.semilogx(C_var * 1e6, res['ripple_factor'][n:], color='#2ca02c',
+                         linewidth=1.5, marker='o', markersize=3)
+            ax2.axvline(C * 1e6, color='r', linestyle='--', linewidth=1,
+                        label=f'C atual = {C * 1e6:.0f} μF')
+            ax2.set_title('2. Dimensionamento do Filtro', fontsize=10, pad=10)
+            ax2.set_xlabel('Capacitância (μF)', fontsize=9)
+            ax2.set_ylabel('Fator de Ripple', fontsize=9)
+            ax2.grid(True, which="both", linestyle=':', alpha=0.7)
+            ax2.legend(fontsize=8, loc='upper right')
+            ax2.tick_params(labelsize=8)
+
+            canvas = FigureCanvasTkAgg(fig, master=janela)
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            fig.tight_layout()
+            canvas.draw()
+
+        except ValueError:
+            messagebox.showerror("Erro", "Digite valores numéricos válidos!")
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao calcular as curvas:\n{str(e)}")
+
     def exportar_dados(self):
         try:
             if self.current_t is None:
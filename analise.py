@@ -0,0 +1,136 @@
+from functools import lru_cache
+
+import numpy as np
+from scipy import fft
+
+
+class AnaliseCiclica:
+    """Análise de ripple e harmônicos sobre um número inteiro de períodos.
+
+    A janela de análise são os últimos ``n_periodos`` períodos completos de
+    ``f0``, reamostrados em ``amostras_por_periodo`` pontos por período.
+    Com a janela síncrona, o harmônico k cai exatamente no bin
+    k * n_periodos de uma única FFT real, sem vazamento espectral.
+    """
+
+    def __init__(self, f0, n_periodos, amostras_por_periodo=256, n_harmonicos=20):
+        self.T = 1 / f0
+        self.n_periodos = n_periodos
+        self.amostras_por_periodo = amostras_por_periodo
+        self.N = n_periodos * amostras_por_periodo
+        self.dt = self.T / amostras_por_periodo
+
+        # Pré-calculados uma vez e reaproveitados a cada execução
+        self.deslocamentos = np.arange(self.N) * self.dt
+        n_harmonicos = min(n_harmonicos, (amostras_por_periodo - 1) // 2)
+        self.bins = np.arange(1, n_harmonicos + 1) * n_periodos
+        escala = np.full(self.N // 2 + 1, 2.0 / self.N ** 2)
+        escala[0] = 0.0  # Componente CC não entra no ripple
+        if self.N % 2 == 0:
+            escala[-1] = 1.0 / self.N ** 2
+        self.escala_potencia = escala
+
+    def janela(self, t, y):
+        # Últimos n_periodos completos, terminando em uma fronteira de período
+        t_fim = np.floor(t[-1] / self.T + 1e-9) * self.T
+        t_ini = t_fim - self.n_periodos * self.T
+        if t_ini < t[0] - 1e-9 * self.T:
+            raise ValueError("Simulação mais curta que a janela de análise")
+        return np.interp(t_ini + self.deslocamentos, t, y)
+
+    def espectro(self, amostras):
+        X = fft.rfft(amostras)
+        harmonicos = 2 * np.abs(X[self.bins]) / self.N
+        fundamental = harmonicos[0] if len(harmonicos) else 0.0
+        thd = (np.sqrt(np.sum(harmonicos[1:] ** 2)) / fundamental
+               if fundamental > 0 else 0.0)
+
+        return {
+            'media': X[0].real / self.N,
+            'pico_a_pico': np.max(amostras) - np.min(amostras),
+            'rms_ripple': np.sqrt(np.sum(self.escala_potencia * np.abs(X) ** 2)),
+            'thd': thd,
+            'harmonicos': harmonicos,
+        }
+
+    def analisar(self, t, y):
+        return self.espectro(self.janela(t, y))
+
+
+@lru_cache(maxsize=32)
+def analise_ciclica(f0, n_periodos, amostras_por_periodo=256, n_harmonicos=20):
+    # Execuções repetidas com a mesma frequência reaproveitam janela e bins
+    return AnaliseCiclica(f0, n_periodos, amostras_por_periodo, n_harmonicos)
+
+
+class JanelaDeslizante:
+    """Versão em blocos da análise: mantém só as amostras da janela.
+
+    Os blocos (t, y) chegam em ordem; cada um é reamostrado na grade
+    síncrona e gravado em um buffer circular de N amostras mais um período,
+    para que o período incompleto mais recente não sobrescreva a janela.
+    O traço completo nunca precisa ficar na memória.
+    """
+
+    def __init__(self, analise):
+        self.analise = analise
+        self.capacidade = analise.N + analise.amostras_por_periodo
+        self.buffer = np.zeros(self.capacidade)
+        self.primeiro = None    # índice global da primeira amostra recebida
+        self.proximo = 0        # índice global da próxima amostra da grade
+        self.ultimo = None      # última amostra bruta, para interpolar entre blocos
+
+    def adicionar(self, t, y):
+        t = np.asarray(t, dtype=float)
+        y = np.asarray(y, dtype=float)
+        if self.ultimo is not None:
+            t = np.concatenate(([self.ultimo[0]], t))
+            y = np.concatenate(([self.ultimo[1]], y))
+        self.ultimo = (t[-1], y[-1])
+
+        dt = self.analise.dt
+        g_ini = max(self.proximo, int(np.ceil(t[0] / dt - 1e-9)))
+        g_fim = int(np.floor(t[-1] / dt + 1e-9))
+        if g_fim < g_ini:
+            return
+
+        if self.primeiro is None:
+            self.primeiro = g_ini
+        # Só as últimas amostras que cabem no buffer precisam ser calculadas
+        g_ini = max(g_ini, g_fim + 1 - self.capacidade)
+        g = np.arange(g_ini, g_fim + 1)
+        self.buffer[g % self.capacidade] = np.interp(g * dt, t, y)
+        self.proximo = g_fim + 1
+
+    def resultado(self):
+        # Janela terminando na última fronteira de período já recebida
+        a = self.analise
+        fim = (self.proximo // a.amostras_por_periodo) * a.amostras_por_periodo
+        if self.primeiro is None:
+            raise ValueError("Amostras insuficientes para a janela de análise")
+        mais_antiga = max(self.primeiro, self.proximo - self.capacidade)
+        if fim - a.N < mais_antiga:
+            raise ValueError("Amostras insuficientes para a janela de análise")
+        return a.espectro(self.buffer[np.arange(fim - a.N, fim) % self.capacidade])
+
+
+if __name__ == "__main__":
+    # Verificação: a versão em blocos deve coincidir com analisar() no
+    # traço completo, para blocos menores, iguais e maiores que N e com o
+    # traço terminando dentro e fora de uma fronteira de período
+    f0 = 60.0
+    analise = analise_ciclica(f0, 4, 256)
+    w0 = 2 * np.pi * f0
+    for n_periodos_traco in (9.5, 10.0):
+        t = np.linspace(0, n_periodos_traco / f0, int(n_periodos_traco * 1000) + 1)
+        y = 5 + np.exp(-30 * t) * np.sin(w0 * t) + 0.3 * np.sin(3 * w0 * t)
+        referencia = analise.analisar(t, y)
+        for bloco in (1000, 1234, 3333, analise.N, len(t)):
+            janela = JanelaDeslizante(analise)
+            for k in range(0, len(t), bloco):
+                janela.adicionar(t[k:k + bloco], y[k:k + bloco])
+            r = janela.resultado()
+            for chave in ('media', 'pico_a_pico', 'rms_ripple', 'thd', 'harmonicos'):
+                assert np.allclose(r[chave], referencia[chave], rtol=1e-9, atol=1e-12), \
+                    (n_periodos_traco, bloco, chave, r[chave], referencia[chave])
+    print("JanelaDeslizante confere com AnaliseCiclica.analisar")
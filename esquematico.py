@@ -0,0 +1,107 @@
+class Esquematico:
+    """Camada de desenho de esquemáticos em modo retido sobre um tk.Canvas.
+
+    Os componentes são criados uma única vez em coordenadas de layout
+    (``largura`` x ``altura``); os ids dos itens ficam guardados para que
+    as atualizações mudem só o texto dos rótulos (``itemconfig``) e o
+    redimensionamento reposicione os itens (``coords``) sem recriá-los.
+    """
+
+    def __init__(self, canvas, largura, altura):
+        self.canvas = canvas
+        self.largura = largura
+        self.altura = altura
+        self.escala = 1.0
+        self.itens = []      # (id, coordenadas de layout, fonte de layout)
+        self.rotulos = {}    # chave -> [id, texto atual]
+        canvas.bind('<Configure>', self._redimensionar, add='+')
+
+    def _fonte(self, fonte):
+        familia, tamanho, *estilo = fonte
+        return (familia, max(6, round(tamanho * self.escala)), *estilo)
+
+    def _criar(self, tipo, coords, fonte=None, **opcoes):
+        if fonte is not None:
+            opcoes['font'] = self._fonte(fonte)
+        criar = getattr(self.canvas, 'create_' + tipo)
+        item = criar(*[v * self.escala for v in coords], **opcoes)
+        self.itens.append((item, list(coords), fonte))
+        return item
+
+    def _redimensionar(self, event):
+        escala = min(event.width / self.largura, event.height / self.altura)
+        if escala <= 0 or abs(escala - self.escala) < 1e-3:
+            return
+        self.escala = escala
+        for item, coords, fonte in self.itens:
+            self.canvas.coords(item, *[v * escala for v in coords])
+            if fonte is not None:
+                self.canvas.itemconfig(item, font=self._fonte(fonte))
+
+    def atualizar_textos(self, textos):
+        # Só os rótulos cujo texto mudou são tocados
+        for chave, texto in textos.items():
+            rotulo = self.rotulos[chave]
+            if rotulo[1] != texto:
+                self.canvas.itemconfig(rotulo[0], text=texto)
+                rotulo[1] = texto
+
+    # Primitivas
+    def linha(self, x1, y1, x2, y2, width=2, **opcoes):
+        return self._criar('line', (x1, y1, x2, y2), width=width, **opcoes)
+
+    def oval(self, x1, y1, x2, y2, **opcoes):
+        return self._criar('oval', (x1, y1, x2, y2), **opcoes)
+
+    def texto(self, x, y, texto, fonte=('Arial', 8), chave=None, **opcoes):
+        item = self._criar('text', (x, y), fonte=fonte, text=texto, **opcoes)
+        if chave is not None:
+            self.rotulos[chave] = [item, texto]
+        return item
+
+    # Componentes
+    def fonte_tensao(self, x, y, texto='', chave=None, raio=25, cor='blue'):
+        self.oval(x - raio, y - raio, x + raio, y + raio, outline=cor, width=2)
+        self.texto(x, y, texto, fonte=('Arial', 9), chave=chave, fill=cor)
+
+    def interruptor(self, x, y, texto='', chave=None):
+        # Chave horizontal de x a x + 40
+        self.linha(x, y, x + 10, y)
+        self.linha(x + 10, y, x + 30, y - 12)
+        self.linha(x + 30, y, x + 40, y)
+        self.texto(x + 20, y - 25, texto, chave=chave)
+
+    def diodo(self, x, y, direcao, modelo='', cor='red', chave=None):
+        if direcao == 'right':
+            points = (x, y - 10, x + 20, y, x, y + 10)  # →
+            c_text = (x + 25, y)
+        elif direcao == 'up':
+            points = (x - 10, y, x, y - 20, x + 10, y)  # ↑
+            c_text = (x, y - 25)
+
+        self._criar('polygon', points, fill=cor, outline='black')
+        self.texto(*c_text, modelo, chave=chave)
+
+    def indutor(self, x, y, texto='', chave=None):
+        for i in range(5):
+            self._criar('arc', (x - 20 + i * 8, y - 10, x - 12 + i * 8, y + 10),
+                        start=0, extent=180, style='arc', width=2)
+        self.texto(x, y - 20, texto, chave=chave)
+
+    def resistor(self, x, y, texto='', chave=None):
+        self._criar('rectangle', (x - 15, y - 10, x + 15, y + 10),
+                    fill='brown', outline='black', width=2)
+        self.texto(x + 35, y, texto, chave=chave)
+
+    def capacitor(self, x, y, texto='', chave=None):
+        # Desenho do capacitor na vertical
+        # Linhas horizontais (placas do capacitor)
+        self.linha(x - 15, y - 15, x + 15, y - 15)  # Placa superior
+        self.linha(x - 15, y + 15, x + 15, y + 15)  # Placa inferior
+
+        # Conexões verticais
+        self.linha(x, y - 25, x, y - 15)  # Conexão superior
+        self.linha(x, y + 15, x, y + 25)  # Conexão inferior
+
+        # Texto do valor (posicionado ao lado)
+        self.texto(x - 60, y, texto, chave=chave, anchor='w')
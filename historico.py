@@ -0,0 +1,178 @@
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+
+LIMITE_PADRAO_BYTES = 256 * 1024 ** 2  # 256 MB
+INDICE = 'indice.json'
+
+
+class HistoricoSimulacoes:
+    """Histórico em disco das simulações concluídas.
+
+    Cada execução fica em um subdiretório com ``meta.json`` (parâmetros e
+    métricas) e um arquivo float64 por forma de onda, lido depois como
+    memória mapeada. O tamanho total é limitado por ``limite_bytes``; ao
+    ultrapassá-lo, as execuções mais antigas são removidas primeiro.
+    """
+
+    def __init__(self, diretorio, limite_bytes=LIMITE_PADRAO_BYTES):
+        self.diretorio = diretorio
+        self.limite_bytes = limite_bytes
+        os.makedirs(diretorio, exist_ok=True)
+
+        caminho = os.path.join(diretorio, INDICE)
+        if os.path.exists(caminho):
+            with open(caminho) as f:
+                self.indice = json.load(f)
+        else:
+            self.indice = {'proximo_id': 1, 'execucoes': []}
+
+        # Remover sobras de gravações interrompidas ou remoções que falharam
+        validos = {self._nome_dir(e['id']) for e in self.indice['execucoes']}
+        for nome in os.listdir(diretorio):
+            caminho_exec = os.path.join(diretorio, nome)
+            if os.path.isdir(caminho_exec) and nome not in validos:
+                shutil.rmtree(caminho_exec, ignore_errors=True)
+
+    @staticmethod
+    def _nome_dir(id_execucao):
+        return f"exec_{id_execucao:06d}"
+
+    def _gravar_indice(self):
+        caminho = os.path.join(self.diretorio, INDICE)
+        tmp = caminho + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.indice, f, indent=1)
+        os.replace(tmp, caminho)
+
+    def salvar(self, parametros, metricas, formas_de_onda):
+        # formas_de_onda: {nome: array 1-D}; devolve o id da execução
+        id_execucao = self.indice['proximo_id']
+        self.indice['proximo_id'] += 1
+
+        destino = os.path.join(self.diretorio, self._nome_dir(id_execucao))
+        tmp = destino + '.tmp'
+        os.makedirs(tmp, exist_ok=True)
+
+        tamanho = 0
+        comprimentos = {}
+        for nome, valores in formas_de_onda.items():
+            dados = np.ascontiguousarray(valores, dtype='<f8')
+            dados.tofile(os.path.join(tmp, nome + '.f8'))
+            comprimentos[nome] = len(dados)
+            tamanho += dados.nbytes
+
+        meta = {
+            'id': id_execucao,
+            'criado_em': time.time(),
+            'parametros': {k: float(v) for k, v in parametros.items()},
+            'metricas': {k: float(v) for k, v in metricas.items()},
+            'formas_de_onda': comprimentos,
+            'bytes': tamanho,
+        }
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=1)
+        os.replace(tmp, destino)
+
+        self.indice['execucoes'].append(meta)
+        self._aplicar_limite()
+        self._gravar_indice()
+        return id_execucao
+
+    def _aplicar_limite(self):
+        execucoes = self.indice['execucoes']
+        total = sum(e['bytes'] for e in execucoes)
+        # A execução mais recente é sempre mantida
+        while total > self.limite_bytes and len(execucoes) > 1:
+            antiga = execucoes.pop(0)
+            total -= antiga['bytes']
+            # Se o arquivo ainda estiver mapeado, a sobra é limpa na próxima abertura
+            shutil.rmtree(os.path.join(self.diretorio, self._nome_dir(antiga['id'])),
+                          ignore_errors=True)
+
+    def listar(self):
+        return list(self.indice['execucoes'])
+
+    def meta(self, id_execucao):
+        for e in self.indice['execucoes']:
+            if e['id'] == id_execucao:
+                return e
+        raise KeyError(id_execucao)
+
+    def forma_de_onda(self, id_execucao, nome):
+        meta = self.meta(id_execucao)
+        n = meta['formas_de_onda'][nome]
+        if n == 0:
+            return np.empty(0)
+        caminho = os.path.join(self.diretorio, self._nome_dir(id_execucao), nome + '.f8')
+        return np.memmap(caminho, dtype='<f8', mode='r', shape=(n,))
+
+    def opcoes(self, excluir=None):
+        # Pares (id, rótulo) das execuções, da mais recente para a mais antiga
+        return [(m['id'], descricao(m)) for m in reversed(self.indice['execucoes'])
+                if m['id'] != excluir]
+
+    def id_da_descricao(self, texto):
+        # Inverso de descricao(); None se o rótulo não existir mais
+        for id_execucao, rotulo in self.opcoes():
+            if rotulo == texto:
+                return id_execucao
+        return None
+
+    def limpar(self):
+        for e in self.indice['execucoes']:
+            shutil.rmtree(os.path.join(self.diretorio, self._nome_dir(e['id'])),
+                          ignore_errors=True)
+        self.indice['execucoes'] = []
+        self._gravar_indice()
+
+
+def descricao(meta):
+    hora = time.strftime('%H:%M:%S', time.localtime(meta['criado_em']))
+    params = ', '.join(f"{k}={v:g}" for k, v in meta['parametros'].items())
+    return f"#{meta['id']} {hora} | {params}"
+
+
+def decimar(t, y, max_pontos=4000):
+    # Passo fixo sobre o memmap: só as amostras plotadas são copiadas para
+    # arrays em memória. Com passo menor que uma página (512 float64), o
+    # sistema ainda lê o arquivo inteiro do disco para o cache de páginas.
+    passo = max(1, len(t) // max_pontos)
+    return np.asarray(t[::passo]), np.asarray(y[::passo])
+
+
+def diferenca(t_ref, y_ref, t_ant, y_ant, max_pontos=4000):
+    # Diferença atual - anterior na grade (decimada) da execução atual
+    t_d, y_d = decimar(t_ref, y_ref, max_pontos)
+    t_a, y_a = decimar(t_ant, y_ant, max_pontos)
+    return t_d, y_d - np.interp(t_d, t_a, y_a)
+
+
+def desenhar_comparacao(ax, historico, id_execucao, nome, t, y, modo, escala_t=1.0):
+    """Sobrepõe (ou subtrai, com modo 'Diferença') uma execução anterior.
+
+    A forma de onda anterior é lida do histórico como memória mapeada e
+    decimada. ``escala_t`` converte o eixo de tempo (ex.: 1000 para ms).
+    Devolve False se não há execução selecionada ou ela já foi removida.
+    """
+    if id_execucao is None or modo == 'Nenhum':
+        return False
+    try:
+        t_ant = historico.forma_de_onda(id_execucao, 't')
+        y_ant = historico.forma_de_onda(id_execucao, nome)
+    except KeyError:
+        return False
+
+    if modo == 'Diferença':
+        t_d, y_d = diferenca(t, y, t_ant, y_ant)
+        ax.plot(t_d * escala_t, y_d, color='k', linewidth=1,
+                label=f'Atual − #{id_execucao}')
+    else:
+        t_d, y_d = decimar(t_ant, y_ant)
+        ax.plot(t_d * escala_t, y_d, color='gray', linewidth=1, alpha=0.7,
+                label=f'Execução #{id_execucao}')
+    return True
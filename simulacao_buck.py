@@ -0,0 +1,168 @@
+import numpy as np
+from scipy.optimize import brentq
+
+from analise import analise_ciclica
+
+
+class _ModoLinear:
+    # Sub-circuito linear do buck com o indutor conduzindo:
+    #   L di/dt = v_fonte - v_C
+    #   C dv/dt = i_L - v_C / R
+    # A solução é exata (exponencial de matriz 2x2 em forma fechada),
+    # então cada intervalo é avançado sem passo de integração.
+    def __init__(self, L, C, R, v_fonte):
+        self.L = L
+        self.v_fonte = v_fonte
+        self.A = np.array([[0.0, -1.0 / L],
+                           [1.0 / C, -1.0 / (R * C)]])
+
+        # Ponto de equilíbrio do modo: i_L = v_fonte / R, v_C = v_fonte
+        self.x_eq = np.array([v_fonte / R, v_fonte])
+
+        # e^{A t} = e^{mu t} [cosh(s t) I + sinh(s t)/s N], com N = A - mu I
+        self.mu = np.trace(self.A) / 2
+        self.N = self.A - self.mu * np.eye(2)
+        self.s = np.sqrt(complex(self.mu ** 2 - np.linalg.det(self.A)))
+
+    def avaliar(self, x0, tau):
+        # Estado [i_L, v_C] nos instantes tau (relativos ao início do intervalo)
+        tau = np.atleast_1d(np.asarray(tau, dtype=float))
+        if self.s == 0:
+            # Amortecimento crítico
+            ex = np.exp(self.mu * tau)
+            ch = ex
+            sh = ex * tau
+        elif self.s.imag == 0:
+            # Superamortecido: combinar as exponenciais diretamente, já que
+            # e^{mu t} cosh(s t) estoura para s t grande; mu + s <= 0 aqui
+            s = self.s.real
+            e_mais = np.exp((self.mu + s) * tau)
+            e_menos = np.exp((self.mu - s) * tau)
+            ch = 0.5 * (e_mais + e_menos)
+            sh = 0.5 * (e_mais - e_menos) / s
+        else:
+            # Subamortecido: cosh/sinh de argumento imaginário são cos/sin
+            ex = np.exp(self.mu * tau)
+            w = self.s.imag
+            ch = ex * np.cos(w * tau)
+            sh = ex * np.sin(w * tau) / w
+
+        dx = np.asarray(x0, dtype=float) - self.x_eq
+        Ndx = self.N @ dx
+        return self.x_eq + ch[:, None] * dx + sh[:, None] * Ndx
+
+    def di_dt(self, x):
+        return (self.v_fonte - x[1]) / self.L
+
+
+def simular_buck(Vin, D, fsw, L, C, R_load, R_esr=0.0, Vd=0.0,
+                 t_sim=5e-3, amostras_por_periodo=200):
+    """Simula o buck com diodo de roda livre e detecção de condução descontínua.
+
+    A simulação é orientada a eventos: os instantes de comutação e o instante
+    em que I_L zera são localizados exatamente, e o intervalo ocioso (DCM) é
+    avançado analiticamente em um único passo. O parâmetro
+    ``amostras_por_periodo`` só define a grade de saída, não a precisão.
+
+    Retorna (t, Vout, V_L, V_C, I_L).
+    """
+    if not 0 < D <= 1:
+        raise ValueError(f"Duty cycle fora de (0, 1]: {D}")
+
+    T = 1 / fsw
+    dt = T / amostras_por_periodo
+    t = np.arange(0, t_sim, dt)
+
+    I_L = np.zeros_like(t)
+    V_C = np.zeros_like(t)
+    V_L = np.zeros_like(t)
+
+    chave_ligada = _ModoLinear(L, C, R_load, Vin)    # MOSFET conduzindo
+    roda_livre = _ModoLinear(L, C, R_load, -Vd)      # Diodo conduzindo
+    tau_RC = R_load * C
+
+    def preencher(ta, tb):
+        # Índices da grade de saída dentro de [ta, tb)
+        i0 = np.searchsorted(t, ta, side='left')
+        i1 = np.searchsorted(t, tb, side='left')
+        return slice(i0, i1)
+
+    def ocioso(x, ta, tb):
+        # Indutor sem corrente: capacitor descarrega apenas na carga
+        sl = preencher(ta, tb)
+        V_C[sl] = x[1] * np.exp(-(t[sl] - ta) / tau_RC)
+        I_L[sl] = 0.0
+        V_L[sl] = 0.0
+        return np.array([0.0, x[1] * np.exp(-(tb - ta) / tau_RC)])
+
+    def conduzindo(modo, x, ta, tb):
+        # Diodo/chave bloqueiam corrente negativa no indutor
+        if x[0] <= 0 and modo.di_dt(x) <= 0:
+            return ocioso(x, ta, tb)
+
+        sl = preencher(ta, tb)
+        tau = np.append(t[sl] - ta, tb - ta)
+        estados = modo.avaliar(x, tau)
+        negativos = np.nonzero((estados[:, 0] < 0) & (tau > 0))[0]
+
+        if len(negativos) == 0:
+            I_L[sl] = estados[:-1, 0]
+            V_C[sl] = estados[:-1, 1]
+            V_L[sl] = modo.v_fonte - estados[:-1, 1]
+            return estados[-1]
+
+        # Evento: I_L cruza zero dentro do intervalo
+        j = negativos[0]
+        tau_a = tau[j - 1] if j > 0 else 0.0
+        i_a = modo.avaliar(x, tau_a)[0, 0]
+        if i_a > 0:
+            tau_e = brentq(lambda s: modo.avaliar(x, s)[0, 0], tau_a, tau[j])
+        else:
+            tau_e = tau_a
+        t_e = ta + tau_e
+
+        antes = preencher(ta, t_e)
+        n = antes.stop - antes.start
+        I_L[antes] = estados[:n, 0]
+        V_C[antes] = estados[:n, 1]
+        V_L[antes] = modo.v_fonte - estados[:n, 1]
+
+        x_e = np.array([0.0, modo.avaliar(x, tau_e)[0, 1]])
+        return ocioso(x_e, t_e, tb)
+
+    # Condições iniciais [i_L, v_C]
+    x = np.array([0.0, 0.0])
+    n_periodos = int(np.ceil(t_sim / T))
+    for k in range(n_periodos):
+        t_ini = k * T
+        t_desl = t_ini + D * T
+        t_fim = (k + 1) * T
+        x = conduzindo(chave_ligada, x, t_ini, t_desl)
+        x = conduzindo(roda_livre, x, t_desl, t_fim)
+
+    # Tensão na carga (com ESR)
+    I_C = I_L - V_C / R_load
+    Vout = V_C + I_C * R_esr
+
+    return t, Vout, V_L, V_C, I_L
+
+
+def metricas_buck(t, Vout, I_L, fsw):
+    # Últimos ~10% da simulação, em um número inteiro de períodos de chaveamento
+    n_periodos = max(1, int(0.1 * t[-1] * fsw))
+    amostras_por_periodo = max(2, int(round(1 / (fsw * (t[1] - t[0])))))
+    analise = analise_ciclica(fsw, n_periodos, amostras_por_periodo)
+
+    tensao = analise.analisar(t, Vout)
+    janela_I = analise.janela(t, I_L)
+    corrente = analise.espectro(janela_I)
+    return {
+        'Vavg': tensao['media'],
+        'Vripple': tensao['pico_a_pico'],
+        'Vripple_rms': tensao['rms_ripple'],
+        'thd': tensao['thd'],
+        'harmonicos': tensao['harmonicos'],
+        'Iripple': corrente['pico_a_pico'],
+        'Iripple_rms': corrente['rms_ripple'],
+        'dcm': bool(np.min(janela_I) <= 0),
+    }
@@ -0,0 +1,165 @@
+import math
+import numpy as np
+from scipy.integrate import odeint
+
+from analise import analise_ciclica
+
+
+def simular_retificador(Vrms, f, R, L, C, Vd_schottky, Vd_common,
+                        n_ciclos=60, n_pontos=10000):
+    """Integra o retificador com filtro LC.
+
+    Retorna (t, V_ac, V_rect, i_L, v_C).
+    """
+    Vp = Vrms * math.sqrt(2)
+    T = 1 / f
+    omega = 2 * math.pi * f
+
+    t = np.linspace(0, n_ciclos * T, n_pontos)
+    y0 = [0, 0]  # [corrente no indutor, tensão no capacitor]
+
+    def circuito_deriv(y, t):
+        i_L, v_C = y
+        v_in = Vp * np.sin(omega * t)
+
+        if v_in > Vd_schottky:
+            v_rect = v_in - Vd_schottky
+        else:
+            v_rect = -Vd_common
+
+        di_Ldt = (v_rect - v_C) / L
+        dv_Cdt = (i_L - v_C / R) / C
+
+        return [di_Ldt, dv_Cdt]
+
+    sol = odeint(circuito_deriv, y0, t)
+    i_L = sol[:, 0]
+    v_C = sol[:, 1]
+
+    # Tensão retificada para plotagem
+    V_ac = Vp * np.sin(omega * t)
+    V_rect = np.where(V_ac > Vd_schottky, V_ac - Vd_schottky, -Vd_common)
+
+    return t, V_ac, V_rect, i_L, v_C
+
+
+def metricas_retificador(t, V_rect, i_L, v_C, f):
+    # Ignorar os primeiros ciclos para regime permanente e analisar um
+    # número inteiro de períodos da rede
+    n_periodos = max(1, int(np.floor((t[-1] - t[0]) * f + 1e-9)) - 2)
+    analise = analise_ciclica(f, n_periodos)
+
+    retificada = analise.analisar(t, V_rect)
+    carga = analise.analisar(t, v_C)
+    corrente = analise.analisar(t, i_L)
+    Vavg_R = carga['media']
+    ripple_V = carga['pico_a_pico']
+    ripple_factor = ripple_V / Vavg_R if Vavg_R != 0 else 0
+
+    return {
+        'Vavg_rect': retificada['media'],
+        'Vavg_R': Vavg_R,
+        'Iavg': corrente['media'],
+        'ripple_V': ripple_V,
+        'ripple_rms': carga['rms_ripple'],
+        'ripple_factor': ripple_factor,
+        'thd': carga['thd'],
+        'harmonicos': carga['harmonicos'],
+    }
+
+
+def simular_retificador_lote(Vrms, f, R, L, C, Vd_schottky, Vd_common,
+                             n_ciclos=60, passos_por_ciclo=256):
+    """Simula N projetos do retificador de uma vez.
+
+    Vrms, R, L, C e as quedas dos diodos podem ser escalares ou arrays
+    (broadcast para N projetos); a frequência da rede ``f`` é comum a todos.
+    O estado (N, 2) avança em um único laço vetorizado, com uma máscara de
+    condução por projeto. O passo usa a exponencial exata do filtro LC com a entrada
+    retificada no ponto médio do passo, então é estável para qualquer dt.
+
+    Retorna um dict de arrays (N,) com Vavg_R, Iavg, ripple_V e
+    ripple_factor, medidos nos mesmos períodos de regime permanente que
+    ``metricas_retificador`` (todos menos os 2 primeiros ciclos).
+    """
+    Vrms, R, L, C, Vd_schottky, Vd_common = np.broadcast_arrays(
+        *[np.asarray(v, dtype=float) for v in (Vrms, R, L, C, Vd_schottky, Vd_common)])
+    Vrms, R, L, C = (v.ravel() for v in (Vrms, R, L, C))
+    Vd_schottky, Vd_common = Vd_schottky.ravel(), Vd_common.ravel()
+    n = len(R)
+
+    Vp = Vrms * math.sqrt(2)
+    omega = 2 * math.pi * f
+    dt = 1 / (f * passos_por_ciclo)
+
+    # A = [[0, -1/L], [1/C, -1/(RC)]] e b = [1/L, 0] para cada projeto
+    A = np.zeros((n, 2, 2))
+    A[:, 0, 1] = -1 / L
+    A[:, 1, 0] = 1 / C
+    A[:, 1, 1] = -1 / (R * C)
+
+    # e^{A dt} = e^{mu dt} [cosh(s dt) I + sinh(s dt)/s N], com N = A - mu I
+    # Esta forma só é segura porque é avaliada em um único dt pequeno: com
+    # s dt > ~700 (RC abaixo de ~1e-8 s a 60 Hz e 256 passos por ciclo)
+    # cosh/sinh estouram, ao contrário de _ModoLinear.avaliar no buck
+    mu = -1 / (2 * R * C)
+    det = 1 / (L * C)
+    s = np.sqrt((mu ** 2 - det).astype(complex))
+    critico = np.abs(s) * dt < 1e-12
+    s_seguro = np.where(critico, 1.0, s)
+    ch = np.cosh(s * dt).real
+    sh = np.where(critico, dt, (np.sinh(s * dt) / s_seguro).real)
+    N = A - mu[:, None, None] * np.eye(2)
+    Phi = np.exp(mu * dt)[:, None, None] * (ch[:, None, None] * np.eye(2)
+                                             + sh[:, None, None] * N)
+
+    # Gamma = A^{-1} (Phi - I) b, com a inversa 2x2 explícita
+    A_inv = np.empty_like(A)
+    A_inv[:, 0, 0] = A[:, 1, 1] / det
+    A_inv[:, 0, 1] = -A[:, 0, 1] / det
+    A_inv[:, 1, 0] = -A[:, 1, 0] / det
+    A_inv[:, 1, 1] = A[:, 0, 0] / det
+    b = np.zeros((n, 2))
+    b[:, 0] = 1 / L
+    Gamma = np.einsum('nij,njk,nk->ni', A_inv, Phi - np.eye(2), b)
+
+    # Janela de regime permanente: todos menos os 2 primeiros ciclos
+    n_passos = n_ciclos * passos_por_ciclo
+    inicio_janela = n_passos - max(1, n_ciclos - 2) * passos_por_ciclo
+
+    # Estado (N, 2) mantido em duas colunas para o passo sair em operações 1-D
+    i_L = np.zeros(n)  # corrente no indutor
+    v_C = np.zeros(n)  # tensão no capacitor
+    P00, P01, P10, P11 = Phi[:, 0, 0], Phi[:, 0, 1], Phi[:, 1, 0], Phi[:, 1, 1]
+    G0, G1 = Gamma[:, 0], Gamma[:, 1]
+
+    soma_i = np.zeros(n)
+    soma_v = np.zeros(n)
+    v_max = np.full(n, -np.inf)
+    v_min = np.full(n, np.inf)
+
+    for k in range(n_passos):
+        # Máscara de condução de cada projeto no ponto médio do passo
+        v_in = Vp * math.sin(omega * (k + 0.5) * dt)
+        v_rect = np.where(v_in > Vd_schottky, v_in - Vd_schottky, -Vd_common)
+        i_L, v_C = (P00 * i_L + P01 * v_C + G0 * v_rect,
+                    P10 * i_L + P11 * v_C + G1 * v_rect)
+
+        if k + 1 > inicio_janela:
+            soma_i += i_L
+            soma_v += v_C
+            np.maximum(v_max, v_C, out=v_max)
+            np.minimum(v_min, v_C, out=v_min)
+
+    n_janela = n_passos - inicio_janela
+    Vavg_R = soma_v / n_janela
+    ripple_V = v_max - v_min
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ripple_factor = np.where(Vavg_R != 0, ripple_V / Vavg_R, 0.0)
+
+    return {
+        'Vavg_R': Vavg_R,
+        'Iavg': soma_i / n_janela,
+        'ripple_V': ripple_V,
+        'ripple_factor': ripple_factor,
+    }
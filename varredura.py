@@ -0,0 +1,262 @@
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from simulacao_buck import simular_buck, metricas_buck
+from simulacao_retificador import simular_retificador, metricas_retificador
+
+
+# Execução de um ponto de operação de cada circuito -> métricas escalares
+def executar_buck(p):
+    if p['Vin'] <= p['Vout']:
+        raise ValueError("A tensão de entrada deve ser maior que a saída!")
+    R_load = p['Vout'] / p['Iout']
+    D = p['Vout'] / p['Vin']
+    t, Vout, V_L, V_C, I_L = simular_buck(
+        p['Vin'], D, p['fsw'], p['L'], p['C'], R_load, p['R_esr'], p['Vd'])
+    return metricas_buck(t, Vout, I_L, p['fsw'])
+
+
+def executar_retificador(p):
+    t, V_ac, V_rect, i_L, v_C = simular_retificador(
+        p['Vrms'], p['freq'], p['R'], p['L'], p['C'],
+        p['Vd_schottky'], p['Vd_common'])
+    return metricas_retificador(t, V_rect, i_L, v_C, p['freq'])
+
+
+# circuito -> (função, parâmetros fixos padrão, métricas gravadas)
+CIRCUITOS = {
+    'buck': (executar_buck,
+             {'Vin': 36.0, 'Vout': 12.0, 'Iout': 2.0, 'fsw': 50000,
+              'L': 220e-6, 'C': 47e-6, 'R_esr': 0.01, 'Vd': 0.5},
+             ['Vavg', 'Vripple', 'Vripple_rms', 'Iripple', 'Iripple_rms', 'thd',
+              'dcm']),
+    'retificador': (executar_retificador,
+                    {'Vrms': 36.0, 'freq': 60.0, 'R': 10.0, 'L': 1.0,
+                     'C': 1000e-6, 'Vd_schottky': 0.3, 'Vd_common': 0.7},
+                    ['Vavg_rect', 'Vavg_R', 'Iavg', 'ripple_V', 'ripple_rms',
+                     'ripple_factor', 'thd']),
+}
+
+MANIFESTO = 'manifesto.json'
+
+
+def gerar_pontos(espec):
+    """Expande a especificação em (nomes, matriz de pontos N x P).
+
+    A especificação tem uma "grade" ({nome: [valores]}, produto cartesiano)
+    ou "amostras" ({"n": N, "semente": s, "faixas": {nome: [min, max, escala]}},
+    com escala "lin" ou "log"). A ordem dos pontos é determinística, o que
+    permite retomar a varredura pelos shards já concluídos.
+    """
+    if 'grade' in espec:
+        nomes = list(espec['grade'])
+        valores = [np.asarray(espec['grade'][n], dtype=float) for n in nomes]
+        pontos = np.array(list(itertools.product(*valores)), dtype=float)
+        return nomes, pontos.reshape(-1, len(nomes))
+
+    if 'amostras' in espec:
+        amostras = espec['amostras']
+        nomes = list(amostras['faixas'])
+        rng = np.random.default_rng(amostras.get('semente', 0))
+        u = rng.random((int(amostras['n']), len(nomes)))
+        pontos = np.empty_like(u)
+        for j, nome in enumerate(nomes):
+            faixa = amostras['faixas'][nome]
+            vmin, vmax = float(faixa[0]), float(faixa[1])
+            escala = faixa[2] if len(faixa) > 2 else 'lin'
+            if escala == 'log':
+                pontos[:, j] = np.exp(np.log(vmin) + u[:, j] * np.log(vmax / vmin))
+            else:
+                pontos[:, j] = vmin + u[:, j] * (vmax - vmin)
+        return nomes, pontos
+
+    raise ValueError("A especificação deve conter 'grade' ou 'amostras'")
+
+
+def _processar_shard(circuito, nomes, fixos, inicio, pontos):
+    funcao, _, metricas = CIRCUITOS[circuito]
+    colunas = {m: np.full(len(pontos), np.nan) for m in metricas}
+
+    for i, linha in enumerate(pontos):
+        p = dict(fixos)
+        p.update(zip(nomes, linha))
+        try:
+            resultado = funcao(p)
+        except (ValueError, ZeroDivisionError):
+            # Ponto de operação inválido (ex.: Vin <= Vout) fica como NaN;
+            # qualquer outro erro é bug e derruba o shard
+            continue
+        for m in metricas:
+            colunas[m][i] = float(resultado[m])
+
+    colunas['indice'] = np.arange(inicio, inicio + len(pontos), dtype=float)
+    for j, nome in enumerate(nomes):
+        colunas[nome] = pontos[:, j]
+    return inicio, colunas
+
+
+def _progresso_padrao(feitos, total, taxa, eta):
+    eta_txt = time.strftime('%H:%M:%S', time.gmtime(eta)) if np.isfinite(eta) else '--:--:--'
+    print(f"[varredura] {feitos}/{total} shards | {taxa:.1f} pontos/s | ETA {eta_txt}",
+          file=sys.stderr, flush=True)
+
+
+def _gravar_manifesto(diretorio, manifesto):
+    caminho = os.path.join(diretorio, MANIFESTO)
+    tmp = caminho + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(manifesto, f, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, caminho)
+
+
+def executar_varredura(espec, diretorio, processos=None, progresso=_progresso_padrao):
+    """Executa a varredura em shards, retomando a partir do que já foi gravado.
+
+    Cada shard concluído é anexado às colunas em ``diretorio`` (um arquivo
+    float64 por coluna) e registrado no manifesto; numa nova execução com a
+    mesma especificação, os shards registrados são pulados.
+    """
+    circuito = espec['circuito']
+    if circuito not in CIRCUITOS:
+        raise ValueError(f"Circuito desconhecido: {circuito}")
+    _, fixos_padrao, metricas = CIRCUITOS[circuito]
+
+    nomes, pontos = gerar_pontos(espec)
+    desconhecidos = (set(nomes) | set(espec.get('fixos', {}))) - set(fixos_padrao)
+    if desconhecidos:
+        raise ValueError(f"Parâmetros desconhecidos para '{circuito}': "
+                         f"{sorted(desconhecidos)}; válidos: {sorted(fixos_padrao)}")
+
+    fixos = dict(fixos_padrao)
+    fixos.update(espec.get('fixos', {}))
+    tamanho = int(espec.get('tamanho_shard', 64))
+    n_shards = (len(pontos) + tamanho - 1) // tamanho
+    colunas = ['indice'] + nomes + metricas
+
+    assinatura = hashlib.sha1(
+        json.dumps(espec, sort_keys=True).encode()).hexdigest()
+
+    os.makedirs(diretorio, exist_ok=True)
+    caminho_manifesto = os.path.join(diretorio, MANIFESTO)
+    if os.path.exists(caminho_manifesto):
+        with open(caminho_manifesto) as f:
+            manifesto = json.load(f)
+        if manifesto['assinatura'] != assinatura:
+            raise ValueError("O diretório contém uma varredura com outra especificação")
+    else:
+        manifesto = {'assinatura': assinatura, 'circuito': circuito,
+                     'fixos': fixos, 'colunas': colunas, 'linhas': 0,
+                     'shards_concluidos': []}
+
+    # Descartar linhas de um shard interrompido no meio da gravação
+    for nome in colunas:
+        with open(os.path.join(diretorio, nome + '.f8'), 'ab') as f:
+            f.truncate(manifesto['linhas'] * 8)
+    # Gravado já aqui para que uma varredura vazia também possa ser lida
+    _gravar_manifesto(diretorio, manifesto)
+
+    concluidos = set(manifesto['shards_concluidos'])
+    pendentes = [k for k in range(n_shards) if k not in concluidos]
+
+    inicio_execucao = time.monotonic()
+    pontos_feitos = 0
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        futuros = {
+            executor.submit(_processar_shard, circuito, nomes, fixos, k * tamanho,
+                            pontos[k * tamanho:(k + 1) * tamanho]): k
+            for k in pendentes
+        }
+        try:
+            for futuro in as_completed(futuros):
+                k = futuros[futuro]
+                _, resultado = futuro.result()
+                n = len(resultado['indice'])
+
+                for nome in colunas:
+                    with open(os.path.join(diretorio, nome + '.f8'), 'ab') as f:
+                        f.write(np.ascontiguousarray(resultado[nome], dtype='<f8').tobytes())
+                        f.flush()
+                        os.fsync(f.fileno())
+
+                manifesto['linhas'] += n
+                manifesto['shards_concluidos'].append(k)
+                _gravar_manifesto(diretorio, manifesto)
+
+                pontos_feitos += n
+                decorrido = time.monotonic() - inicio_execucao
+                taxa = pontos_feitos / decorrido if decorrido > 0 else 0.0
+                restantes = len(pontos) - manifesto['linhas']
+                eta = restantes / taxa if taxa > 0 else float('inf')
+                if progresso is not None:
+                    progresso(len(manifesto['shards_concluidos']), n_shards, taxa, eta)
+        except BaseException:
+            # Interrupção: não iniciar os shards ainda na fila
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    return ResultadoVarredura(diretorio)
+
+
+class ResultadoVarredura:
+    # Acesso às colunas gravadas por memória mapeada, sem carregar tudo na RAM.
+    # As linhas ficam na ordem em que os shards terminaram; use a coluna
+    # 'indice' (ou em_ordem) para recuperar a ordem dos pontos.
+    def __init__(self, diretorio):
+        self.diretorio = diretorio
+        with open(os.path.join(diretorio, MANIFESTO)) as f:
+            self.manifesto = json.load(f)
+        self.colunas = self.manifesto['colunas']
+
+    def __len__(self):
+        return self.manifesto['linhas']
+
+    def __getitem__(self, nome):
+        if nome not in self.colunas:
+            raise KeyError(nome)
+        if len(self) == 0:
+            return np.empty(0)
+        return np.memmap(os.path.join(self.diretorio, nome + '.f8'),
+                         dtype='<f8', mode='r', shape=(len(self),))
+
+    def ordem(self):
+        # Permutação que coloca as linhas na ordem dos pontos da especificação
+        return np.argsort(self['indice'], kind='stable')
+
+    def em_ordem(self, nome):
+        return np.asarray(self[nome])[self.ordem()]
+
+    def filtrar(self, condicao, colunas=None, bloco=65536):
+        # condicao recebe {coluna: valores do bloco} e devolve uma máscara booleana
+        colunas = colunas or self.colunas
+        mapas = {nome: self[nome] for nome in self.colunas}
+        partes = {nome: [] for nome in colunas}
+        for i in range(0, len(self), bloco):
+            dados = {nome: np.asarray(m[i:i + bloco]) for nome, m in mapas.items()}
+            mascara = condicao(dados)
+            for nome in colunas:
+                partes[nome].append(dados[nome][mascara])
+        return {nome: np.concatenate(p) if p else np.empty(0)
+                for nome, p in partes.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Varredura de parâmetros retomável")
+    parser.add_argument('especificacao', help="arquivo JSON com a especificação")
+    parser.add_argument('saida', help="diretório dos resultados")
+    parser.add_argument('--processos', type=int, default=None)
+    args = parser.parse_args()
+
+    with open(args.especificacao) as f:
+        espec = json.load(f)
+    resultado = executar_varredura(espec, args.saida, args.processos)
+    print(f"{len(resultado)} pontos em {args.saida}")